@@ -1,10 +1,17 @@
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, Optional
 import json
 from .models import ConversationState, TripSpec, UserProfile
 from .interfaces import ILLMProvider, StateStore
 from .tools import Tools
+from .geocoder import normalize_place_name
 from .logger import get_logger
-from .prompts import ROUTER_SYSTEM_PROMPT, RESPONSE_SYSTEM_PROMPT
+from .prompts import (
+    ROUTER_SYSTEM_PROMPT,
+    ROUTER_CONTEXT_TEMPLATE,
+    ROUTER_SCHEMA,
+    RESPONSE_SYSTEM_PROMPT,
+    RESPONSE_CONTEXT_TEMPLATE,
+)
 from .config import settings
 
 __all__ = ["TravelAgent"]
@@ -17,17 +24,28 @@ class TravelAgent:
         self.provider = provider
         self.store = store
 
-    async def run_turn(self, session_id: str, user_input: str) -> str:
+    async def run_turn(
+        self,
+        session_id: str,
+        user_input: str,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> str:
+        """
+        Runs one conversation turn and returns the assistant reply.
+        If on_token is given, the reply is streamed and each chunk is
+        passed to it as it arrives.
+        """
         logger.info("run_turn_start", session_id=session_id)
 
         state = await self.store.load(session_id)
         state.history.append({"role": "user", "content": user_input})
 
-        # Router step
+        # Router step: static prompt first (cacheable prefix), then volatile context
         router_messages = [
+            {"role": "system", "content": ROUTER_SYSTEM_PROMPT},
             {
                 "role": "system",
-                "content": ROUTER_SYSTEM_PROMPT.format(
+                "content": ROUTER_CONTEXT_TEMPLATE.format(
                     user_profile=state.user_profile.model_dump_json(),
                     trip_spec=state.trip_spec.model_dump_json(),
                 ),
@@ -35,29 +53,15 @@ class TravelAgent:
             {"role": "user", "content": f"User's latest message: {user_input}"},
         ]
 
-        router_schema = {
-            "type": "object",
-            "properties": {
-                "intent": {
-                    "type": "string",
-                    "enum": ["plan_trip", "packing", "attractions", "chat"],
-                },
-                "extracted_updates": {
-                    "type": "object",
-                    "properties": {
-                        "trip_spec": {"type": "object"},
-                        "user_profile": {"type": "object"},
-                    },
-                },
-                "tool_call": {"type": "string", "enum": ["weather", "none"]},
-                "reasoning": {"type": "string"},
-            },
-            "required": ["intent", "tool_call", "reasoning"],
-        }
-
         # Call LLM for decision
-        decision = await self.provider.json_chat(router_messages, schema=router_schema)
-        logger.info("router_decision", session_id=session_id, decision=decision)
+        decision = await self.provider.json_chat(router_messages, schema=ROUTER_SCHEMA)
+        logger.info(
+            "router_decision",
+            session_id=session_id,
+            intent=decision.get("intent"),
+            tool_call=decision.get("tool_call"),
+            reasoning=decision.get("reasoning"),
+        )
 
         # Apply state updates
         updates = decision.get("extracted_updates", {})
@@ -67,10 +71,14 @@ class TravelAgent:
         # Tool execution
         tool_output = ""
         tool_call = decision.get("tool_call")
-        dest = state.trip_spec.destination
+        stops = state.trip_spec.stops()
 
         if tool_call == "weather":
-            if dest:
+            if len(stops) > 1:
+                logger.info("executing_tool", tool="weather_batch", legs=len(stops))
+                tool_output = await Tools.get_weather_batch(stops)
+            elif stops:
+                dest = stops[0].destination
                 logger.info("executing_tool", tool="weather", destination=dest)
                 geo = await Tools.get_lat_lon(dest)
                 if geo:
@@ -88,19 +96,27 @@ class TravelAgent:
 
         # Response generation
         response_messages = [
+            {"role": "system", "content": RESPONSE_SYSTEM_PROMPT},
             {
                 "role": "system",
-                "content": RESPONSE_SYSTEM_PROMPT.format(
+                "content": RESPONSE_CONTEXT_TEMPLATE.format(
                     user_profile=state.user_profile.model_dump_json(),
                     trip_spec=state.trip_spec.model_dump_json(),
                     tool_output=tool_output,
                 ),
-            }
+            },
         ]
         # Append recent conversation history (configurable turns)
         response_messages.extend(state.history[-settings.CONTEXT_WINDOW_TURNS :])
 
-        final_answer = await self.provider.chat(response_messages)
+        if on_token:
+            chunks = []
+            async for chunk in self.provider.stream_chat(response_messages):
+                chunks.append(chunk)
+                await on_token(chunk)
+            final_answer = "".join(chunks)
+        else:
+            final_answer = await self.provider.chat(response_messages)
 
         # Strip quotes if model wrapped response in them
         if final_answer.startswith('"') and final_answer.endswith('"'):
@@ -111,14 +127,37 @@ class TravelAgent:
 
         return final_answer
 
+    @staticmethod
+    def _same_place(a: Optional[str], b: Optional[str]) -> bool:
+        """Loose name match: "rome" and "Rome, Italy" both name the Rome leg."""
+        if not a or not b:
+            return False
+        return normalize_place_name(a.partition(",")[0]) == normalize_place_name(
+            b.partition(",")[0]
+        )
+
     def _apply_updates(self, state: ConversationState, updates: Dict[str, Any]):
         if "trip_spec" in updates and isinstance(updates["trip_spec"], dict):
             try:
+                trip_updates = updates["trip_spec"]
+                # An explicit empty "legs" list clears a multi-city plan
                 valid_updates = {
                     k: v
-                    for k, v in updates["trip_spec"].items()
-                    if v not in (None, [], "")
+                    for k, v in trip_updates.items()
+                    if v not in (None, [], "") or (k == "legs" and v == [])
                 }
+                # A new single destination replaces legs it is not part of
+                new_dest = valid_updates.get("destination")
+                if (
+                    new_dest
+                    and "legs" not in trip_updates
+                    and not self._same_place(new_dest, state.trip_spec.destination)
+                    and not any(
+                        self._same_place(new_dest, leg.destination)
+                        for leg in state.trip_spec.legs
+                    )
+                ):
+                    valid_updates["legs"] = []
                 current_data = state.trip_spec.model_dump()
                 current_data.update(valid_updates)
                 state.trip_spec = TripSpec(**current_data)
@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,6 +11,12 @@ class Settings(BaseSettings):
     APP_NAME: str = "Yalla Trip"
     DEBUG: bool = False
 
+    # Logging (rendered and written on a background thread)
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_MAX_VALUE_CHARS: int = 2000
+    # Per-event keep rate, e.g. {"llm_request_start": 0.1}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
     # LLM Provider: "ollama" or "openai"
     LLM_PROVIDER: str = "ollama"
     LLM_MODEL: str = "llama3.2:3b"
@@ -21,6 +28,15 @@ class Settings(BaseSettings):
     # OpenAI (cloud)
     OPENAI_API_KEY: str = ""
 
+    # Geocoding: GeoNames-style gazetteer (empty = bundled city list)
+    GAZETTEER_PATH: str = ""
+    GEOCODER_ONLINE_FALLBACK: bool = True
+
+    # WebSocket chat transport
+    WS_HEARTBEAT_SECONDS: float = 20.0
+    WS_MAX_PENDING_TURNS: int = 4
+    WS_SEND_QUEUE_SIZE: int = 256
+
     # Persistence
     DB_PATH: str = "yalla_trip.db"
 
@@ -0,0 +1,324 @@
+import bisect
+import difflib
+import mmap
+import os
+import re
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple, Union
+from .config import settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = ["Geocoder", "get_geocoder", "normalize_place_name"]
+
+BUNDLED_GAZETTEER = os.path.join(os.path.dirname(__file__), "data", "cities.tsv")
+
+# GeoNames dump column positions (tab separated)
+_COL_NAME = 1
+_COL_ASCII = 2
+_COL_ALTERNATES = 3
+_COL_LAT = 4
+_COL_LON = 5
+_COL_COUNTRY = 8
+_COL_ADMIN1 = 10
+_COL_POPULATION = 14
+
+# Loose (prefix/fuzzy) matching only for long keys, so short aliases like
+# "lon" or partial words like "new" never capture unrelated cities
+_MIN_LOOSE_LEN = 5
+_FUZZY_LEN_SLACK = 1
+_FUZZY_CUTOFF = 0.85
+
+# Country names accepted as hints in "City, Country" (GeoNames uses ISO codes)
+_COUNTRY_HINTS = {
+    "uk": "gb",
+    "united kingdom": "gb",
+    "great britain": "gb",
+    "britain": "gb",
+    "england": "gb",
+    "scotland": "gb",
+    "usa": "us",
+    "united states": "us",
+    "america": "us",
+    "uae": "ae",
+    "united arab emirates": "ae",
+    "argentina": "ar",
+    "australia": "au",
+    "austria": "at",
+    "belgium": "be",
+    "brazil": "br",
+    "canada": "ca",
+    "china": "cn",
+    "cuba": "cu",
+    "czech republic": "cz",
+    "czechia": "cz",
+    "denmark": "dk",
+    "egypt": "eg",
+    "france": "fr",
+    "germany": "de",
+    "greece": "gr",
+    "hungary": "hu",
+    "iceland": "is",
+    "india": "in",
+    "indonesia": "id",
+    "ireland": "ie",
+    "israel": "il",
+    "italy": "it",
+    "japan": "jp",
+    "south korea": "kr",
+    "korea": "kr",
+    "mexico": "mx",
+    "morocco": "ma",
+    "netherlands": "nl",
+    "holland": "nl",
+    "new zealand": "nz",
+    "norway": "no",
+    "peru": "pe",
+    "portugal": "pt",
+    "singapore": "sg",
+    "south africa": "za",
+    "spain": "es",
+    "sweden": "se",
+    "thailand": "th",
+    "turkey": "tr",
+    "vietnam": "vn",
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_place_name(name: str) -> str:
+    """Lowercases, strips accents and punctuation ("D.C." -> "dc")."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_only = "".join(c for c in decomposed if not unicodedata.combining(c))
+    cleaned = ascii_only.lower().replace(".", "").replace("'", "")
+    cleaned = _PUNCT_RE.sub(" ", cleaned)
+    return _SPACE_RE.sub(" ", cleaned).strip()
+
+
+class _StringArray:
+    """Strings packed into one bytes blob plus an offsets array."""
+
+    def __init__(self):
+        self._blob: Union[bytearray, bytes] = bytearray()
+        self._offsets = array("I", [0])
+
+    def append(self, value: str):
+        self._blob += value.encode("utf-8")
+        self._offsets.append(len(self._blob))
+
+    def freeze(self):
+        self._blob = bytes(self._blob)
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i] : self._offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+class _RawView:
+    """Sequence of the raw bytes of a _StringArray, for bisect."""
+
+    def __init__(self, strings: _StringArray):
+        self._strings = strings
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._strings.raw(i)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+class Geocoder:
+    """
+    Offline city geocoder backed by a GeoNames-style gazetteer.
+    The dump is read through mmap into flat arrays: per-city coordinates,
+    populations and packed names, plus a sorted, offset-indexed key table
+    (normalized names and aliases) pointing at population-ranked rows.
+    """
+
+    def __init__(self):
+        self._names = _StringArray()
+        self._country = _StringArray()
+        self._admin1 = _StringArray()
+        self._lat = array("d")
+        self._lon = array("d")
+        self._population = array("q")
+        self._keys = _StringArray()
+        self._key_view = _RawView(self._keys)
+        self._postings: "array[int]" = array("I")
+        self._posting_offsets: "array[int]" = array("I", [0])
+        # (first letter, length) -> key ids eligible for fuzzy matching
+        self._fuzzy_buckets: Dict[Tuple[str, int], "array[int]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Geocoder":
+        geocoder = cls()
+        aliases: Dict[str, List[int]] = {}
+        if os.path.getsize(path) > 0:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                for raw in iter(mm.readline, b""):
+                    geocoder._add_row(
+                        raw.decode("utf-8").rstrip("\r\n").split("\t"), aliases
+                    )
+        geocoder._build_index(aliases)
+        return geocoder
+
+    def _add_row(self, cols: List[str], aliases: Dict[str, List[int]]):
+        if len(cols) <= _COL_POPULATION:
+            return
+        try:
+            lat = float(cols[_COL_LAT])
+            lon = float(cols[_COL_LON])
+            population = int(cols[_COL_POPULATION] or 0)
+        except ValueError:
+            return
+
+        row = len(self._names)
+        self._names.append(cols[_COL_NAME])
+        self._country.append(cols[_COL_COUNTRY].lower())
+        self._admin1.append(cols[_COL_ADMIN1].lower())
+        self._lat.append(lat)
+        self._lon.append(lon)
+        self._population.append(population)
+
+        names = [cols[_COL_NAME], cols[_COL_ASCII]]
+        names.extend(cols[_COL_ALTERNATES].split(","))
+        for key in {normalize_place_name(n) for n in names if n}:
+            if key:
+                aliases.setdefault(key, []).append(row)
+
+    def _build_index(self, aliases: Dict[str, List[int]]):
+        """Packs the temporary alias dict into the sorted key/postings arrays."""
+        for key in sorted(aliases, key=lambda k: k.encode("utf-8")):
+            key_id = len(self._keys)
+            self._keys.append(key)
+            rows = sorted(aliases[key], key=lambda r: self._population[r], reverse=True)
+            self._postings.extend(rows)
+            self._posting_offsets.append(len(self._postings))
+            if len(key) >= _MIN_LOOSE_LEN:
+                self._fuzzy_buckets.setdefault((key[0], len(key)), array("I")).append(
+                    key_id
+                )
+        for strings in (self._names, self._country, self._admin1, self._keys):
+            strings.freeze()
+
+    def lookup(self, query: str) -> Optional[Dict[str, float]]:
+        """
+        Resolves a place name by exact name/alias, or "City, hint" where the
+        hint is a country (code or name) or admin1 code. Ambiguous names go
+        to the most populous city; a hint that matches nothing is a miss.
+        """
+        key = normalize_place_name(query)
+        if not key:
+            return None
+
+        row = self._best(self._rows(key))
+        if row is None and "," in query:
+            head, _, hint = query.partition(",")
+            row = self._best(
+                self._rows(normalize_place_name(head)), normalize_place_name(hint)
+            )
+        return self._result(row)
+
+    def lookup_loose(self, query: str) -> Optional[Dict[str, float]]:
+        """
+        Exact lookup, then unambiguous prefix or fuzzy matches on long keys.
+        Only meant for offline use: a loose hit can still be the wrong city.
+        """
+        result = self.lookup(query)
+        if result:
+            return result
+
+        key = normalize_place_name(query.partition(",")[0])
+        if len(key) < _MIN_LOOSE_LEN:
+            return None
+        row = self._prefix_match(key)
+        if row is None:
+            row = self._fuzzy_match(key)
+        return self._result(row)
+
+    def _result(self, row: Optional[int]) -> Optional[Dict[str, float]]:
+        if row is None:
+            return None
+        return {
+            "lat": self._lat[row],
+            "lon": self._lon[row],
+            "name": self._names[row],
+        }
+
+    def _key_id(self, key: str) -> Optional[int]:
+        raw = key.encode("utf-8")
+        i = bisect.bisect_left(self._key_view, raw)
+        if i < len(self._keys) and self._keys.raw(i) == raw:
+            return i
+        return None
+
+    def _rows_for(self, key_id: int) -> "array[int]":
+        return self._postings[
+            self._posting_offsets[key_id] : self._posting_offsets[key_id + 1]
+        ]
+
+    def _rows(self, key: str) -> Optional["array[int]"]:
+        key_id = self._key_id(key)
+        return self._rows_for(key_id) if key_id is not None else None
+
+    def _best(self, rows: Optional["array[int]"], hint: str = "") -> Optional[int]:
+        if not rows:
+            return None
+        if not hint:
+            return int(rows[0])
+        codes = {hint, _COUNTRY_HINTS.get(hint, hint)}
+        for row in rows:
+            if self._country[row] in codes or self._admin1[row] in codes:
+                return int(row)
+        return None
+
+    def _prefix_match(self, key: str) -> Optional[int]:
+        raw = key.encode("utf-8")
+        start = bisect.bisect_left(self._key_view, raw)
+        rows: Set[int] = set()
+        for key_id in range(start, len(self._keys)):
+            if not self._keys.raw(key_id).startswith(raw):
+                break
+            rows.add(int(self._rows_for(key_id)[0]))
+            if len(rows) > 1:
+                return None  # Ambiguous
+        return rows.pop() if rows else None
+
+    def _fuzzy_match(self, key: str) -> Optional[int]:
+        candidates: Dict[str, int] = {}
+        for length in range(
+            len(key) - _FUZZY_LEN_SLACK, len(key) + _FUZZY_LEN_SLACK + 1
+        ):
+            for key_id in self._fuzzy_buckets.get((key[0], length), ()):
+                candidates[self._keys[key_id]] = key_id
+        matches = difflib.get_close_matches(key, candidates, n=2, cutoff=_FUZZY_CUTOFF)
+        rows = {int(self._rows_for(candidates[m])[0]) for m in matches}
+        return rows.pop() if len(rows) == 1 else None
+
+
+@lru_cache(maxsize=1)
+def get_geocoder() -> Geocoder:
+    """Loads the configured gazetteer once; an empty index if unavailable."""
+    path = settings.GAZETTEER_PATH or BUNDLED_GAZETTEER
+    try:
+        geocoder = Geocoder.from_file(path)
+        logger.info("gazetteer_loaded", path=path, cities=len(geocoder))
+        return geocoder
+    except OSError as e:
+        logger.warning("gazetteer_load_failed", path=path, error=str(e))
+        return Geocoder()
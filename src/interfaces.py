@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from .models import ConversationState
 
 
@@ -22,8 +22,15 @@ class ILLMProvider(ABC):
     ) -> str:
         pass
 
+    @abstractmethod
+    def stream_chat(
+        self, messages: List[Dict[str, str]], temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Yields the reply as text chunks while it is generated."""
+        pass
+
     @abstractmethod
     async def json_chat(
-        self, messages: List[Dict[str, str]], schema: Dict[str, Any] = None
+        self, messages: List[Dict[str, str]], schema: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         pass
@@ -1,13 +1,179 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
+from typing import Any, Callable, Dict, Optional, TextIO
 import structlog
 from .config import settings
 
+_sink: Optional["QueueLogSink"] = None
+_stdlib_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class QueueLogSink:
+    """
+    Final structlog processor that hands events to a background thread.
+    Truncation, rendering and writing happen off the caller's thread, so a
+    slow stdout never stalls the event loop. Events are dropped (and
+    counted) when the queue is full. While stopped, events are written
+    synchronously instead.
+    """
+
+    def __init__(
+        self,
+        renderer: Callable[..., str],
+        stream: TextIO = sys.stdout,
+        maxsize: int = 10000,
+        max_value_chars: int = 2000,
+    ):
+        self.renderer = renderer
+        self.stream = stream
+        self.max_value_chars = max_value_chars
+        self.dropped = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self.start()
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]):
+        if self._thread is None:
+            self._write(method_name, event_dict)
+            raise structlog.DropEvent
+        try:
+            self._queue.put_nowait((method_name, event_dict))
+        except queue.Full:
+            self.record_drop()
+        raise structlog.DropEvent
+
+    def record_drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def start(self):
+        """Starts the writer thread; a no-op while it is running."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 2.0):
+        """Stops the writer thread and flushes whatever is still queued."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+            thread.join(timeout)
+        except queue.Full:
+            pass
+        if thread.is_alive():
+            return  # Stuck on the stream; leave the rest to it
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._write(*item)
+        self._report_dropped()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._report_dropped()
+                break
+            method_name, event_dict = item
+            self._write(method_name, event_dict)
+            if self._queue.empty():
+                self._report_dropped()
+
+    def _write(self, method_name: str, event_dict: Dict[str, Any]):
+        try:
+            line = self.renderer(None, method_name, self._truncate(event_dict))
+            self.stream.write(line + "\n")
+            self.stream.flush()
+        except Exception:  # Logging must never take the writer thread down
+            pass
+
+    def _report_dropped(self):
+        with self._lock:
+            pending = self.dropped - self._reported
+            self._reported = self.dropped
+        if pending:
+            self._write(
+                "warning",
+                {"event": "log_events_dropped", "level": "warning", "dropped": pending},
+            )
+
+    def _truncate(self, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        limit = self.max_value_chars
+        for key, value in event_dict.items():
+            if key == "exception":
+                continue
+            if isinstance(value, (dict, list, tuple)):
+                text = json.dumps(value, default=str)
+                if len(text) > limit:
+                    event_dict[key] = (
+                        f"{text[:limit]}...[truncated {len(text) - limit} chars]"
+                    )
+            elif isinstance(value, str) and len(value) > limit:
+                event_dict[key] = (
+                    f"{value[:limit]}...[truncated {len(value) - limit} chars]"
+                )
+        return event_dict
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for stdlib loggers (uvicorn, httpx...) that never blocks:
+    records are formatted by the listener thread and dropped when full.
+    """
+
+    def __init__(self, log_queue: queue.Queue, sink: QueueLogSink):
+        super().__init__(log_queue)
+        self.sink = sink
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record  # Same process, so formatting can wait for the listener
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.sink.record_drop()
+
+
+def sample_events(rates: Dict[str, float]):
+    """Processor keeping only a fraction of the listed events (e.g. 0.1 = 10%)."""
+
+    def processor(logger: Any, method_name: str, event_dict: Dict[str, Any]):
+        rate = rates.get(event_dict.get("event", ""))
+        if rate is not None and random.random() >= rate:
+            raise structlog.DropEvent
+        return event_dict
+
+    return processor
+
+
+def _capture_exc_info(logger: Any, method_name: str, event_dict: Dict[str, Any]):
+    """Resolves exc_info=True on the calling thread, before it is queued."""
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
 
 def configure_logging():
     """Configures structured logging."""
+    global _sink, _stdlib_listener
 
     shared_processors = [
+        sample_events(settings.LOG_SAMPLE_RATES),
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="%H:%M:%S"),  # Shorter timestamp
@@ -15,22 +181,49 @@ def configure_logging():
 
     if settings.DEBUG:
         # Pretty printing for development
-        processors = shared_processors + [
-            structlog.dev.ConsoleRenderer(colors=True),
-        ]
+        processors = shared_processors + [_capture_exc_info]
+        renderer = structlog.dev.ConsoleRenderer(colors=True)
     else:
         # JSON output for production
-        processors = shared_processors + [
-            structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer(),
-        ]
+        processors = shared_processors + [structlog.processors.dict_tracebacks]
+        renderer = structlog.processors.JSONRenderer()
+
+    if _stdlib_listener is not None:
+        _stdlib_listener.stop()
+    # One sink per process: loggers cached on first use keep the processor
+    # chain they were built with, so the sink it ends in must stay alive
+    if _sink is None:
+        _sink = QueueLogSink(
+            renderer,
+            maxsize=settings.LOG_QUEUE_SIZE,
+            max_value_chars=settings.LOG_MAX_VALUE_CHARS,
+        )
+    else:
+        _sink.renderer = renderer
+        _sink.max_value_chars = settings.LOG_MAX_VALUE_CHARS
+        _sink.start()
 
     structlog.configure(
-        processors=processors,
+        processors=processors + [_sink],
         logger_factory=structlog.PrintLoggerFactory(),
         cache_logger_on_first_use=True,
     )
 
+    # stdlib logging (uvicorn access lines included) is written by a listener thread
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _stdlib_listener = logging.handlers.QueueListener(log_queue, stdout_handler)
+    _stdlib_listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [DroppingQueueHandler(log_queue, _sink)]
+    root.setLevel(logging.INFO)
+    # uvicorn installs its own stdout handlers; send its records to the queue instead
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
     # Silence noisy loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)  # OpenAI HTTP spam
     logging.getLogger("httpcore").setLevel(logging.WARNING)
@@ -40,7 +233,25 @@ def configure_logging():
     if settings.DEBUG:
         logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
-    logging.basicConfig(format="%(message)s", stream=sys.stdout, level=logging.INFO)
+
+def shutdown_logging():
+    """
+    Flushes and stops the background log writers, if running. Later events
+    are written synchronously until configure_logging() restarts them.
+    """
+    global _stdlib_listener
+    if _stdlib_listener is not None:
+        _stdlib_listener.stop()
+        _stdlib_listener = None
+    if _sink is not None:
+        _sink.close()
+
+
+def dropped_log_events() -> int:
+    return _sink.dropped if _sink is not None else 0
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str):
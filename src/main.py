@@ -1,16 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 import uvicorn
 import os
+import asyncio
 from contextlib import asynccontextmanager
 
 from .agent import TravelAgent
 from .state import SQLiteStateStore
 from .provider import LLMProvider
+from .geocoder import get_geocoder
+from .ws import ConnectionManager
 from .config import settings
-from .logger import configure_logging, get_logger
+from .logger import configure_logging, dropped_log_events, get_logger
 
 configure_logging()
 logger = get_logger(__name__)
@@ -18,11 +21,13 @@ logger = get_logger(__name__)
 store = SQLiteStateStore()
 provider = LLMProvider()
 agent = TravelAgent(provider=provider, store=store)
+ws_manager = ConnectionManager()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await store.init_db()
+    await asyncio.to_thread(get_geocoder)  # Load gazetteer off the event loop
     logger.info("startup_complete")
     yield
     logger.info("shutdown")
@@ -58,7 +63,12 @@ async def read_root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint for load balancers and orchestrators."""
-    return {"status": "healthy", "service": settings.APP_NAME}
+    return {
+        "status": "healthy",
+        "service": settings.APP_NAME,
+        "log_events_dropped": dropped_log_events(),
+        "prompt_prefix": provider.prefix_stats.as_dict(),
+    }
 
 
 @app.post("/chat", response_model=ChatResponse)
@@ -73,5 +83,11 @@ async def chat_endpoint(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/ws")
+async def chat_socket(websocket: WebSocket, session_id: str = "default_session"):
+    """Persistent chat connection: streamed turns, heartbeat and server push."""
+    await ws_manager.handle(websocket, agent, session_id)
+
+
 if __name__ == "__main__":
     uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=settings.DEBUG)
@@ -1,7 +1,7 @@
 from typing import List, Optional, Literal, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
-__all__ = ["UserProfile", "TripSpec", "ConversationState"]
+__all__ = ["UserProfile", "TripLeg", "TripSpec", "ConversationState"]
 
 
 class UserProfile(BaseModel):
@@ -17,6 +17,14 @@ class UserProfile(BaseModel):
     )
 
 
+class TripLeg(BaseModel):
+    destination: str = Field(..., description="City for this leg of the trip")
+    start_date: Optional[str] = Field(
+        None, description="ISO date or vague time for arriving at this leg"
+    )
+    end_date: Optional[str] = Field(None, description="ISO date or vague time")
+
+
 class TripSpec(BaseModel):
     destination: Optional[str] = Field(
         None, description="Target destination city/country"
@@ -32,6 +40,32 @@ class TripSpec(BaseModel):
     travelers: Optional[str] = Field(
         None, description="Who is traveling (e.g., 'solo', 'couple', 'family')"
     )
+    legs: List[TripLeg] = Field(
+        default_factory=list,
+        description="Ordered stops for multi-city trips (e.g., Rome then Florence)",
+    )
+
+    @field_validator("legs", mode="before")
+    @classmethod
+    def _coerce_legs(cls, value):
+        """Accepts plain city names ("Rome") as legs, as small models often send them."""
+        if isinstance(value, list):
+            return [{"destination": v} if isinstance(v, str) else v for v in value]
+        return value
+
+    def stops(self) -> List[TripLeg]:
+        """Legs of the trip; a single-destination trip is one leg."""
+        if self.legs:
+            return self.legs
+        if self.destination:
+            return [
+                TripLeg(
+                    destination=self.destination,
+                    start_date=self.start_date,
+                    end_date=self.end_date,
+                )
+            ]
+        return []
 
 
 class ConversationState(BaseModel):
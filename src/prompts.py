@@ -1,8 +1,13 @@
+import json
+from typing import Any, Dict, Optional
+
+# Static prompts must stay free of per-session data: they form the byte-identical
+# prefix that provider prompt caching (OpenAI) and KV-cache reuse (llama.cpp/Ollama)
+# depend on. Volatile context goes in a separate message after them.
+
 ROUTER_SYSTEM_PROMPT = """You are the 'Brain' of a Travel Assistant.
 Your goal is to analyze the conversation using chain-of-thought reasoning.
-
-Current User Profile: {user_profile}
-Current Trip Spec: {trip_spec}
+The current user profile and trip spec are given in the next system message.
 
 THINK STEP BY STEP:
 1. EXPLICIT INTENT: What is the user directly asking for?
@@ -23,10 +28,15 @@ THINK STEP BY STEP:
    - Budget mentioned (cheap/luxury/budget)? → update user_profile.budget
    - Traveler type (solo/couple/family)? → update trip_spec.travelers
    - Dates mentioned? → update trip_spec.start_date/end_date
+   - Several cities in sequence? → set trip_spec.legs as an ordered list of
+     {"destination", "start_date", "end_date"} (use ISO dates when known)
+   - Example: "Rome then Florence then Venice" → legs = [{"destination": "Rome"},
+     {"destination": "Florence"}, {"destination": "Venice"}]
+   - Back to a single city (e.g. "actually just Paris")? → set destination and legs = []
    - Interests mentioned (food/history/nature)? → add to user_profile.interests
 
 4. TOOL DECISION:
-   - "weather": Use if user asks about weather, packing, or outdoor activities AND destination is known
+   - "weather": Use if user asks about weather, packing, or outdoor activities AND destination (or legs) is known
    - "none": For general planning, greetings, or when destination unknown
 
 Output JSON conforming to the schema. Include your reasoning in the 'reasoning' field.
@@ -37,10 +47,8 @@ RESPONSE_SYSTEM_PROMPT = """You are Yalla, a friendly and knowledgeable travel c
 PERSONA: Warm but efficient. Enthusiastic about travel without being overly bubbly.
 Think of yourself as a well-traveled friend who gives practical, personalized advice.
 
-CONTEXT:
-- User Profile: {user_profile}
-- Trip Spec: {trip_spec}
-- Weather/Tool Data: {tool_output}
+CONTEXT: The user profile, trip spec and weather/tool data are given in the
+next system message.
 
 RESPONSE GUIDELINES:
 
@@ -69,3 +77,55 @@ RESPONSE GUIDELINES:
    - Be actionable: Give specific, useful suggestions
    - Don't over-explain or be preachy
 """
+
+ROUTER_CONTEXT_TEMPLATE = """Current User Profile: {user_profile}
+Current Trip Spec: {trip_spec}"""
+
+RESPONSE_CONTEXT_TEMPLATE = """CONTEXT:
+- User Profile: {user_profile}
+- Trip Spec: {trip_spec}
+- Weather/Tool Data: {tool_output}"""
+
+ROUTER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "intent": {
+            "type": "string",
+            "enum": ["plan_trip", "packing", "attractions", "chat"],
+        },
+        "extracted_updates": {
+            "type": "object",
+            "properties": {
+                "trip_spec": {"type": "object"},
+                "user_profile": {"type": "object"},
+            },
+        },
+        "tool_call": {"type": "string", "enum": ["weather", "none"]},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["intent", "tool_call", "reasoning"],
+}
+
+
+_JSON_ONLY_INSTRUCTION = (
+    "\n\nIMPORTANT: You must respond with valid JSON only. No markdown, no explanation."
+)
+
+
+def _render_json_instruction(schema: Optional[Dict[str, Any]]) -> str:
+    if not schema:
+        return _JSON_ONLY_INSTRUCTION
+    return (
+        _JSON_ONLY_INSTRUCTION + f" Follow this schema:\n{json.dumps(schema, indent=2)}"
+    )
+
+
+# Rendered once so every router request sends identical prefix bytes
+ROUTER_JSON_INSTRUCTION = _render_json_instruction(ROUTER_SCHEMA)
+
+
+def json_instruction(schema: Optional[Dict[str, Any]] = None) -> str:
+    """JSON-mode instruction appended to the static system prompt."""
+    if schema is ROUTER_SCHEMA:
+        return ROUTER_JSON_INSTRUCTION
+    return _render_json_instruction(schema)
@@ -1,14 +1,72 @@
 import json
 import time
-from typing import List, Dict, Any
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Dict, Any, Optional, Set
 from openai import AsyncOpenAI, APIError
 from .interfaces import ILLMProvider
 from .config import settings
 from .logger import get_logger
+from .prompts import json_instruction
 
 logger = get_logger(__name__)
 
-__all__ = ["LLMProvider"]
+__all__ = ["LLMProvider", "PrefixCacheStats", "token_usage"]
+
+# Per-task token totals; callers that want usage (e.g. replay) set a dict here
+token_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "token_usage", default=None
+)
+
+
+def _record_usage(usage: Any):
+    totals = token_usage.get()
+    if totals is None or usage is None:
+        return
+    prompt = usage.prompt_tokens or 0
+    completion = usage.completion_tokens or 0
+    totals["prompt_tokens"] = totals.get("prompt_tokens", 0) + prompt
+    totals["completion_tokens"] = totals.get("completion_tokens", 0) + completion
+
+
+class PrefixCacheStats:
+    """
+    Tracks how often requests start with an already-seen system prompt
+    (a reusable cache prefix) and how many prompt tokens the API reports
+    as served from its cache.
+    """
+
+    def __init__(self, max_prefixes: int = 64):
+        self.max_prefixes = max_prefixes
+        self.requests = 0
+        self.reused = 0
+        self.cached_tokens = 0
+        self._seen: Set[int] = set()
+
+    def observe(self, messages: List[Dict[str, str]]) -> bool:
+        self.requests += 1
+        if not messages or messages[0]["role"] != "system":
+            return False
+        key = hash(messages[0]["content"])
+        if key in self._seen:
+            self.reused += 1
+            return True
+        if len(self._seen) < self.max_prefixes:
+            self._seen.add(key)
+        return False
+
+    def record_usage(self, usage: Any):
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_tokens += getattr(details, "cached_tokens", None) or 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "reused": self.reused,
+            "reuse_rate": (
+                round(self.reused / self.requests, 3) if self.requests else 0.0
+            ),
+            "cached_tokens": self.cached_tokens,
+        }
 
 
 class LLMProvider(ILLMProvider):
@@ -19,6 +77,7 @@ class LLMProvider(ILLMProvider):
         self.model = settings.LLM_MODEL
         self.api_key = self._get_api_key()
         self.base_url = self._get_base_url()
+        self.prefix_stats = PrefixCacheStats()
 
         logger.info(
             "llm_config",
@@ -43,7 +102,13 @@ class LLMProvider(ILLMProvider):
         self, messages: List[Dict[str, str]], temperature: float = 0.7
     ) -> str:
         start_time = time.time()
-        logger.info("llm_request_start", model=self.model, message_count=len(messages))
+        prefix_reused = self.prefix_stats.observe(messages)
+        logger.info(
+            "llm_request_start",
+            model=self.model,
+            message_count=len(messages),
+            prefix_reused=prefix_reused,
+        )
 
         try:
             response = await self.client.chat.completions.create(
@@ -54,28 +119,67 @@ class LLMProvider(ILLMProvider):
             )
             elapsed = time.time() - start_time
             logger.info("llm_request_success", duration=elapsed)
+            self.prefix_stats.record_usage(response.usage)
+            _record_usage(response.usage)
             return response.choices[0].message.content or ""
         except APIError as e:
             elapsed = time.time() - start_time
             logger.error("llm_request_failed", duration=elapsed, error=str(e))
             raise e
 
-    async def json_chat(
-        self, messages: List[Dict[str, str]], schema: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
+    async def stream_chat(
+        self, messages: List[Dict[str, str]], temperature: float = 0.7
+    ) -> AsyncIterator[str]:
         start_time = time.time()
-        logger.info("llm_json_request_start", model=self.model)
+        prefix_reused = self.prefix_stats.observe(messages)
+        logger.info(
+            "llm_stream_start",
+            model=self.model,
+            message_count=len(messages),
+            prefix_reused=prefix_reused,
+        )
 
-        json_instruction = "\n\nIMPORTANT: You must respond with valid JSON only. No markdown, no explanation."
-        if schema:
-            json_instruction += f" Follow this schema:\n{json.dumps(schema, indent=2)}"
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                # Usage (incl. cached prompt tokens) arrives in a final, choice-less chunk
+                stream_options={"include_usage": True},
+            )
+            usage = None
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            elapsed = time.time() - start_time
+            logger.info("llm_stream_success", duration=elapsed)
+            self.prefix_stats.record_usage(usage)
+            _record_usage(usage)
+        except APIError as e:
+            elapsed = time.time() - start_time
+            logger.error("llm_stream_failed", duration=elapsed, error=str(e))
+            raise e
 
+    async def json_chat(
+        self, messages: List[Dict[str, str]], schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        start_time = time.time()
+        instruction = json_instruction(schema)
         msgs_to_send = [dict(m) for m in messages]
 
+        # Appended to the static system prompt so the schema stays in the cached prefix
         if msgs_to_send and msgs_to_send[0]["role"] == "system":
-            msgs_to_send[0]["content"] += json_instruction
+            msgs_to_send[0]["content"] += instruction
         else:
-            msgs_to_send.insert(0, {"role": "system", "content": json_instruction})
+            msgs_to_send.insert(0, {"role": "system", "content": instruction})
+
+        prefix_reused = self.prefix_stats.observe(msgs_to_send)
+        logger.info(
+            "llm_json_request_start", model=self.model, prefix_reused=prefix_reused
+        )
 
         try:
             request_kwargs = {
@@ -93,6 +197,8 @@ class LLMProvider(ILLMProvider):
             content = response.choices[0].message.content or ""
             elapsed = time.time() - start_time
             logger.info("llm_json_request_success", duration=elapsed)
+            self.prefix_stats.record_usage(response.usage)
+            _record_usage(response.usage)
 
             # Strip markdown code blocks if present
             content = content.strip()
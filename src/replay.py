@@ -0,0 +1,341 @@
+"""
+Offline replay runner: re-plays recorded conversations through TravelAgent.
+
+    python -m src.replay --input conversations.jsonl --output results.jsonl
+    python -m src.replay --from-db yalla_trip.db --output results.jsonl --stub
+
+Input lines look like {"conversation_id": "...", "messages": [{"role", "content"}]}
+(the `history` format stored in the sessions table). Only user messages are
+replayed; the original assistant replies are kept as `reference`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+import aiosqlite
+from .agent import TravelAgent
+from .config import settings
+from .interfaces import ILLMProvider
+from .logger import configure_logging, get_logger
+from .provider import LLMProvider, token_usage
+from .state import MemoryStateStore
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "StubProvider",
+    "load_conversations",
+    "export_sessions",
+    "replay_conversation",
+    "run_replay",
+]
+
+
+class StubProvider(ILLMProvider):
+    """Deterministic local provider for replaying without an LLM."""
+
+    async def chat(
+        self, messages: List[Dict[str, str]], temperature: float = 0.7
+    ) -> str:
+        return f"Stub reply to: {messages[-1]['content'][:80]}"
+
+    async def stream_chat(
+        self, messages: List[Dict[str, str]], temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        yield await self.chat(messages, temperature)
+
+    async def json_chat(
+        self, messages: List[Dict[str, str]], schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return {"intent": "chat", "tool_call": "none", "reasoning": "stub"}
+
+
+class _RecordingProvider(ILLMProvider):
+    """Wraps a provider for one conversation and keeps the router decisions."""
+
+    def __init__(self, inner: ILLMProvider):
+        self.inner = inner
+        self.decisions: List[Dict[str, Any]] = []
+
+    async def chat(
+        self, messages: List[Dict[str, str]], temperature: float = 0.7
+    ) -> str:
+        return await self.inner.chat(messages, temperature)
+
+    async def stream_chat(
+        self, messages: List[Dict[str, str]], temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        async for chunk in self.inner.stream_chat(messages, temperature):
+            yield chunk
+
+    async def json_chat(
+        self, messages: List[Dict[str, str]], schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        decision = await self.inner.json_chat(messages, schema=schema)
+        self.decisions.append(decision)
+        return decision
+
+
+def _is_valid_conversation(record: Any) -> bool:
+    """Replayable records have a messages list of {"role": str, "content": str}."""
+    if not isinstance(record, dict) or not isinstance(record.get("messages"), list):
+        return False
+    return all(
+        isinstance(m, dict)
+        and isinstance(m.get("role"), str)
+        and isinstance(m.get("content"), str)
+        for m in record["messages"]
+    )
+
+
+def load_conversations(path: str) -> Iterable[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(
+                    "replay_record_skipped", line=line_no, reason="invalid_json"
+                )
+                continue
+            if not _is_valid_conversation(record):
+                logger.warning(
+                    "replay_record_skipped", line=line_no, reason="invalid_messages"
+                )
+                continue
+            record.setdefault("conversation_id", f"line_{line_no}")
+            yield record
+
+
+async def export_sessions(db_path: str) -> List[Dict[str, Any]]:
+    """Reads conversations from the sessions table in replay input format."""
+    conversations = []
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("SELECT session_id, data FROM sessions") as cursor:
+            async for session_id, data in cursor:
+                try:
+                    history = json.loads(data).get("history", [])
+                except (json.JSONDecodeError, AttributeError):
+                    logger.error("failed_to_decode_state", session_id=session_id)
+                    continue
+                record = {"conversation_id": session_id, "messages": history}
+                if not _is_valid_conversation(record):
+                    logger.warning(
+                        "replay_record_skipped",
+                        session_id=session_id,
+                        reason="invalid_messages",
+                    )
+                    continue
+                conversations.append(record)
+    return conversations
+
+
+async def replay_conversation(
+    provider: ILLMProvider, conversation: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Replays the user turns of one conversation; returns a record per turn."""
+    conversation_id = str(conversation["conversation_id"])
+    recorder = _RecordingProvider(provider)
+    agent = TravelAgent(provider=recorder, store=MemoryStateStore())
+
+    messages = conversation.get("messages", [])
+    results: List[Dict[str, Any]] = []
+    for i, message in enumerate(messages):
+        if message.get("role") != "user":
+            continue
+        following = messages[i + 1] if i + 1 < len(messages) else {}
+        reference = (
+            following.get("content") if following.get("role") == "assistant" else None
+        )
+
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        token_usage.set(usage)
+        decisions_before = len(recorder.decisions)
+        start_time = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = await agent.run_turn(conversation_id, message["content"])
+        except Exception as e:
+            error = str(e)
+        latency = time.perf_counter() - start_time
+
+        decision = (
+            recorder.decisions[-1] if len(recorder.decisions) > decisions_before else {}
+        )
+        results.append(
+            {
+                "conversation_id": conversation_id,
+                "turn": len(results),
+                "user": message["content"],
+                "response": response,
+                "reference": reference,
+                "intent": decision.get("intent"),
+                "tool_call": decision.get("tool_call"),
+                "decision": decision,
+                "latency_ms": round(latency * 1000, 1),
+                "prompt_tokens": usage["prompt_tokens"],
+                "completion_tokens": usage["completion_tokens"],
+                "error": error,
+            }
+        )
+        if error:
+            break
+    return results
+
+
+def _load_checkpoint(output_path: str, checkpoint_path: str) -> Set[str]:
+    """Returns finished conversation ids and drops partial results from the output."""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, encoding="utf-8") as f:
+        done = {line.strip() for line in f if line.strip()}
+
+    if os.path.exists(output_path):
+        kept = []
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    if json.loads(line)["conversation_id"] in done:
+                        kept.append(line)
+                except (json.JSONDecodeError, KeyError):
+                    continue  # Torn write from an interrupted run
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+    return done
+
+
+async def run_replay(
+    conversations: Iterable[Dict[str, Any]],
+    provider: ILLMProvider,
+    output_path: str,
+    concurrency: int = 8,
+) -> Dict[str, Any]:
+    """
+    Replays conversations with a bounded worker pool.
+    Each finished conversation is appended to output_path; those without
+    errors also go to output_path + ".checkpoint", so a resumed run skips
+    them and retries the rest.
+    """
+    checkpoint_path = output_path + ".checkpoint"
+    done = _load_checkpoint(output_path, checkpoint_path)
+    pending: asyncio.Queue = asyncio.Queue()
+    for conversation in conversations:
+        if str(conversation["conversation_id"]) not in done:
+            pending.put_nowait(conversation)
+
+    stats: Dict[str, Any] = {
+        "skipped": len(done),
+        "conversations": 0,
+        "turns": 0,
+        "errors": 0,
+        "failed": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+    }
+    latencies: List[float] = []
+
+    with open(output_path, "a", encoding="utf-8") as out, open(
+        checkpoint_path, "a", encoding="utf-8"
+    ) as checkpoint:
+
+        async def worker():
+            while True:
+                try:
+                    conversation = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                conversation_id = str(conversation["conversation_id"])
+                try:
+                    turns = await replay_conversation(provider, conversation)
+                except Exception as e:
+                    logger.error(
+                        "replay_conversation_failed",
+                        conversation_id=conversation_id,
+                        error=str(e),
+                    )
+                    stats["failed"] += 1
+                    continue
+                out.writelines(json.dumps(t, default=str) + "\n" for t in turns)
+                out.flush()
+                failed = any(t["error"] for t in turns)
+                # Failed conversations stay out of the checkpoint so a resume retries them
+                if failed:
+                    stats["failed"] += 1
+                else:
+                    checkpoint.write(f"{conversation_id}\n")
+                    checkpoint.flush()
+
+                stats["conversations"] += 1
+                stats["turns"] += len(turns)
+                stats["errors"] += sum(1 for t in turns if t["error"])
+                stats["prompt_tokens"] += sum(t["prompt_tokens"] for t in turns)
+                stats["completion_tokens"] += sum(t["completion_tokens"] for t in turns)
+                latencies.extend(t["latency_ms"] for t in turns)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    if latencies:
+        latencies.sort()
+        stats["latency_p50_ms"] = latencies[len(latencies) // 2]
+        stats["latency_p95_ms"] = latencies[
+            min(len(latencies) - 1, int(len(latencies) * 0.95))
+        ]
+    logger.info("replay_complete", **stats)
+    return stats
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded conversations through the agent."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of conversations")
+    source.add_argument(
+        "--from-db", help="Export conversations from this sessions database"
+    )
+    parser.add_argument(
+        "--output", required=True, help="JSONL results file (resumable)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Conversations replayed at once"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Replay at most N conversations"
+    )
+    parser.add_argument(
+        "--stub",
+        action="store_true",
+        help="Use the local stub instead of the configured LLM",
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = _parse_args(argv)
+    if args.from_db:
+        conversations: Iterable[Dict[str, Any]] = await export_sessions(args.from_db)
+    else:
+        conversations = list(load_conversations(args.input))
+    if args.limit is not None:
+        conversations = list(conversations)[: args.limit]
+
+    provider = StubProvider() if args.stub else LLMProvider()
+    logger.info(
+        "replay_start",
+        provider="stub" if args.stub else settings.LLM_PROVIDER,
+        concurrency=args.concurrency,
+    )
+    stats = await run_replay(conversations, provider, args.output, args.concurrency)
+    print(json.dumps(stats, indent=2))
+    return stats
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
@@ -1,4 +1,5 @@
 import json
+from typing import Dict
 import aiosqlite
 from .interfaces import StateStore
 from .models import ConversationState
@@ -7,7 +8,7 @@ from .config import settings
 
 logger = get_logger(__name__)
 
-__all__ = ["SQLiteStateStore"]
+__all__ = ["SQLiteStateStore", "MemoryStateStore"]
 
 
 class SQLiteStateStore(StateStore):
@@ -49,3 +50,19 @@ class SQLiteStateStore(StateStore):
                 (session_id, data),
             )
             await db.commit()
+
+
+class MemoryStateStore(StateStore):
+    """In-process store, e.g. for offline replay that must not touch the DB."""
+
+    def __init__(self):
+        self._sessions: Dict[str, str] = {}
+
+    async def load(self, session_id: str) -> ConversationState:
+        data = self._sessions.get(session_id)
+        if data is None:
+            return ConversationState()
+        return ConversationState.model_validate_json(data)
+
+    async def save(self, session_id: str, state: ConversationState):
+        self._sessions[session_id] = state.model_dump_json()
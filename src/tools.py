@@ -1,6 +1,11 @@
+import asyncio
 import httpx
+from datetime import date
 from typing import Optional, Dict, List
+from .config import settings
+from .geocoder import get_geocoder
 from .logger import get_logger
+from .models import TripLeg
 
 logger = get_logger(__name__)
 
@@ -11,9 +16,22 @@ class Tools:
     @staticmethod
     async def get_lat_lon(city_name: str) -> Optional[Dict[str, float]]:
         """
-        Geocodes a city name to lat/lon using Open-Meteo Geocoding API.
-        Handles common abbreviations and variations.
+        Geocodes a city name to lat/lon.
+        Uses exact gazetteer matches first, then falls back to the Open-Meteo
+        Geocoding API (handling common abbreviations and variations).
+        Without the online fallback, prefix/fuzzy matching runs instead.
         """
+        geocoder = get_geocoder()
+        local = geocoder.lookup(city_name)
+        if local:
+            return local
+        if not settings.GEOCODER_ONLINE_FALLBACK:
+            # Loose matching scans candidate keys, keep it off the event loop
+            local = await asyncio.to_thread(geocoder.lookup_loose, city_name)
+            if not local:
+                logger.warning("geocoding_miss", city=city_name, source="gazetteer")
+            return local
+
         # Normalize common city name patterns
         normalized = city_name.strip()
         variations = [normalized]
@@ -72,17 +90,109 @@ class Tools:
                     return "Weather data unavailable."
 
                 daily = data["daily"]
-                summary = []
                 # Return first 5 days
-                for i in range(min(5, len(daily["time"]))):
-                    date = daily["time"][i]
-                    max_temp = daily["temperature_2m_max"][i]
-                    min_temp = daily["temperature_2m_min"][i]
-                    precip = daily["precipitation_sum"][i]
-                    summary.append(
-                        f"{date}: High {max_temp}°C, Low {min_temp}°C, Rain {precip}mm"
-                    )
-
-                return "Forecast:\n" + "\n".join(summary)
+                days = range(min(5, len(daily["time"])))
+                return "Forecast:\n" + Tools._format_days(daily, days)
             except Exception as e:
                 return f"Error fetching weather: {e}"
+
+    @staticmethod
+    async def get_weather_batch(legs: List[TripLeg]) -> str:
+        """
+        Fetches forecasts for every leg of a multi-city trip.
+        Geocodes legs concurrently, then makes a single Open-Meteo request
+        with comma-separated coordinates and slices each leg to its dates.
+        """
+        geos = await asyncio.gather(
+            *(Tools.get_lat_lon(leg.destination) for leg in legs)
+        )
+
+        sections = [f"{leg.destination}: Weather data unavailable." for leg in legs]
+        located = []
+        for i, (leg, geo) in enumerate(zip(legs, geos)):
+            if geo:
+                located.append((i, geo))
+            else:
+                sections[i] = f"{leg.destination}: Could not find coordinates."
+
+        if located:
+            url = "https://api.open-meteo.com/v1/forecast"
+            params = {
+                "latitude": ",".join(str(geo["lat"]) for _, geo in located),
+                "longitude": ",".join(str(geo["lon"]) for _, geo in located),
+                "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,weather_code",
+                "timezone": "auto",
+                "forecast_days": 16,
+            }
+
+            async with httpx.AsyncClient() as client:
+                try:
+                    resp = await client.get(url, params=params, timeout=5.0)
+                    data = resp.json()
+                    if resp.status_code != 200:
+                        reason = data.get("reason") if isinstance(data, dict) else None
+                        raise ValueError(reason or f"HTTP {resp.status_code}")
+                    # Multiple coordinates return a list, one location an object
+                    results = data if isinstance(data, list) else [data]
+                    if len(results) != len(located):
+                        raise ValueError(
+                            f"expected {len(located)} locations, got {len(results)}"
+                        )
+                    for (i, _), result in zip(located, results):
+                        sections[i] = Tools._format_leg(legs[i], result.get("daily"))
+                except Exception as e:
+                    logger.warning(
+                        "weather_batch_error", legs=len(located), error=str(e)
+                    )
+                    for i, _ in located:
+                        sections[i] = (
+                            f"{legs[i].destination}: Error fetching weather: {e}"
+                        )
+
+        return "Forecast by leg:\n" + "\n\n".join(sections)
+
+    @staticmethod
+    def _format_leg(leg: TripLeg, daily: Optional[Dict[str, List]]) -> str:
+        """Formats one leg's forecast, limited to its dates when they are ISO dates."""
+        if not daily:
+            return f"{leg.destination}: Weather data unavailable."
+
+        start = Tools._parse_date(leg.start_date)
+        if start:
+            end = Tools._parse_date(leg.end_date) or start
+            days = [
+                i
+                for i, day in enumerate(daily["time"])
+                if start <= date.fromisoformat(day) <= end
+            ]
+            header = f"{leg.destination} ({start.isoformat()} to {end.isoformat()}):"
+            if not days:
+                return f"{header}\nForecast not yet available for these dates."
+        else:
+            days = list(range(min(5, len(daily["time"]))))
+            header = f"{leg.destination}:"
+
+        return header + "\n" + Tools._format_days(daily, days)
+
+    @staticmethod
+    def _format_days(daily: Dict[str, List], days) -> str:
+        summary = []
+        for i in days:
+            day = daily["time"][i]
+            max_temp = daily["temperature_2m_max"][i]
+            min_temp = daily["temperature_2m_min"][i]
+            precip = daily["precipitation_sum"][i]
+            summary.append(
+                f"{day}: High {max_temp}°C, Low {min_temp}°C, Rain {precip}mm"
+            )
+        return "\n".join(summary)
+
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> Optional[date]:
+        """Parses ISO dates; vague times like 'next week' return None."""
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Dict, Set
+from fastapi import WebSocket, WebSocketDisconnect
+from .agent import TravelAgent
+from .config import settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+__all__ = ["ChatConnection", "ConnectionManager"]
+
+
+class ChatConnection:
+    """
+    One long-lived WebSocket bound to a session.
+    Turns are queued and run in order (they share the session state),
+    replies stream back as deltas, and outgoing frames go through a bounded
+    queue so a slow client slows the producer instead of growing memory.
+
+    Client -> server: {"type": "message", "id", "message"}, {"type": "ping" | "pong"}
+    Server -> client: {"type": "start" | "delta" | "done" | "error", "id", ...},
+                      {"type": "ping" | "pong"}, {"type": "push", ...}
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        agent: TravelAgent,
+        session_id: str,
+        heartbeat_seconds: float = settings.WS_HEARTBEAT_SECONDS,
+        max_pending_turns: int = settings.WS_MAX_PENDING_TURNS,
+        send_queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+    ):
+        self.websocket = websocket
+        self.agent = agent
+        self.session_id = session_id
+        self.heartbeat_seconds = heartbeat_seconds
+        self._turns: asyncio.Queue = asyncio.Queue(maxsize=max_pending_turns)
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=send_queue_size)
+        self._last_seen = time.monotonic()
+
+    async def send(self, payload: Dict[str, Any]):
+        """Queues a frame, waiting while the client is behind."""
+        await self._outbox.put(payload)
+
+    def push(self, payload: Dict[str, Any]) -> bool:
+        """Server push from background work; returns False if the client is behind."""
+        try:
+            self._outbox.put_nowait({"type": "push", **payload})
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def serve(self):
+        tasks = [
+            asyncio.create_task(self._receive_loop()),
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._turn_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                logger.warning(
+                    "ws_connection_error", session_id=self.session_id, error=str(error)
+                )
+
+    async def _receive_loop(self):
+        while True:
+            try:
+                text = await self.websocket.receive_text()
+            except WebSocketDisconnect:
+                return
+            self._last_seen = time.monotonic()
+
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError:
+                await self.send({"type": "error", "detail": "invalid_json"})
+                continue
+
+            kind = data.get("type") if isinstance(data, dict) else None
+            if kind == "ping":
+                await self.send({"type": "pong"})
+            elif kind == "pong":
+                continue
+            elif kind == "message":
+                await self._enqueue_turn(data)
+            else:
+                await self.send({"type": "error", "detail": "unknown_type"})
+
+    async def _enqueue_turn(self, data: Dict[str, Any]):
+        turn_id = str(data.get("id") or uuid.uuid4().hex)
+        message = data.get("message")
+        if not isinstance(message, str) or not message.strip():
+            await self.send(
+                {"type": "error", "id": turn_id, "detail": "invalid_message"}
+            )
+            return
+        try:
+            self._turns.put_nowait((turn_id, message))
+        except asyncio.QueueFull:
+            await self.send({"type": "error", "id": turn_id, "detail": "busy"})
+
+    async def _turn_loop(self):
+        while True:
+            turn_id, message = await self._turns.get()
+            await self.send({"type": "start", "id": turn_id})
+
+            async def on_token(chunk: str):
+                await self.send({"type": "delta", "id": turn_id, "text": chunk})
+
+            try:
+                reply = await self.agent.run_turn(
+                    self.session_id, message, on_token=on_token
+                )
+                await self.send({"type": "done", "id": turn_id, "response": reply})
+            except Exception as e:
+                logger.error(
+                    "turn_processing_error",
+                    error=str(e),
+                    session_id=self.session_id,
+                    transport="ws",
+                )
+                await self.send({"type": "error", "id": turn_id, "detail": str(e)})
+
+    async def _send_loop(self):
+        while True:
+            payload = await self._outbox.get()
+            await self.websocket.send_json(payload)
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if time.monotonic() - self._last_seen > 2 * self.heartbeat_seconds:
+                logger.info("ws_heartbeat_timeout", session_id=self.session_id)
+                return
+            await self.send({"type": "ping"})
+
+
+class ConnectionManager:
+    """Tracks open connections per session so background work can push to them."""
+
+    def __init__(self):
+        self._connections: Dict[str, Set[ChatConnection]] = {}
+
+    async def handle(self, websocket: WebSocket, agent: TravelAgent, session_id: str):
+        await websocket.accept()
+        connection = ChatConnection(websocket, agent, session_id)
+        self._connections.setdefault(session_id, set()).add(connection)
+        logger.info("ws_connected", session_id=session_id)
+
+        try:
+            await connection.serve()
+        finally:
+            sessions = self._connections.get(session_id, set())
+            sessions.discard(connection)
+            if not sessions:
+                self._connections.pop(session_id, None)
+            logger.info("ws_disconnected", session_id=session_id)
+            try:
+                await websocket.close()
+            except (RuntimeError, WebSocketDisconnect):
+                pass  # Already closed by the client
+
+    def push(self, session_id: str, payload: Dict[str, Any]) -> int:
+        """Sends payload to every connection of a session; returns how many accepted it."""
+        connections = self._connections.get(session_id, set())
+        return sum(connection.push(payload) for connection in list(connections))
@@ -0,0 +1,119 @@
+import pytest
+import respx
+from httpx import Response
+
+from src.geocoder import Geocoder, BUNDLED_GAZETTEER, normalize_place_name
+from src.tools import Tools
+
+
+@pytest.fixture(scope="module")
+def geocoder():
+    return Geocoder.from_file(BUNDLED_GAZETTEER)
+
+
+class TestGeocoder:
+
+    def test_normalize_place_name(self):
+        assert normalize_place_name("Washington D.C.") == "washington dc"
+        assert normalize_place_name("  São  Paulo ") == "sao paulo"
+        assert normalize_place_name("Tel Aviv-Yafo") == "tel aviv yafo"
+
+    def test_exact_lookup(self, geocoder):
+        result = geocoder.lookup("Tokyo")
+        assert result["name"] == "Tokyo"
+        assert result["lat"] == pytest.approx(35.69, abs=0.01)
+
+    def test_alias_lookup(self, geocoder):
+        assert geocoder.lookup("NYC")["name"] == "New York City"
+        assert geocoder.lookup("Washington D.C.")["name"] == "Washington"
+        assert geocoder.lookup("Firenze")["name"] == "Florence"
+
+    def test_population_ranked_disambiguation(self, geocoder):
+        assert geocoder.lookup("Paris")["lon"] == pytest.approx(2.35, abs=0.01)
+        assert geocoder.lookup("London")["lon"] == pytest.approx(-0.13, abs=0.01)
+
+    def test_hint_disambiguation(self, geocoder):
+        assert geocoder.lookup("Paris, TX")["lon"] == pytest.approx(-95.56, abs=0.01)
+        assert geocoder.lookup("London, CA")["lon"] == pytest.approx(-81.23, abs=0.01)
+        assert geocoder.lookup("London, UK")["lon"] == pytest.approx(-0.13, abs=0.01)
+        assert geocoder.lookup("Paris, France")["lon"] == pytest.approx(2.35, abs=0.01)
+
+    def test_unmatched_hint_is_a_miss(self, geocoder):
+        assert geocoder.lookup("Rome, GA") is None
+        assert geocoder.lookup("Sydney, Nova Scotia") is None
+        assert geocoder.lookup("Berlin, US") is None
+
+    def test_exact_lookup_never_guesses(self, geocoder):
+        for query in ("Lyon", "Leon", "New", "Bar", "Barcel", "Amsterdm"):
+            assert geocoder.lookup(query) is None
+
+    def test_loose_lookup(self, geocoder):
+        assert geocoder.lookup_loose("Tokyo")["name"] == "Tokyo"
+        assert geocoder.lookup_loose("Barcel")["name"] == "Barcelona"
+        assert geocoder.lookup_loose("Amsterdm")["name"] == "Amsterdam"
+
+    def test_loose_lookup_skips_short_and_ambiguous_keys(self, geocoder):
+        assert geocoder.lookup_loose("Lyon") is None
+        assert geocoder.lookup_loose("Leon") is None
+        assert geocoder.lookup_loose("New") is None
+        assert geocoder.lookup_loose("Bar") is None
+        assert geocoder.lookup_loose("Las Ve")["name"] == "Las Vegas"
+
+    def test_loose_lookup_ambiguous_prefix(self, tmp_path):
+        path = tmp_path / "cities.tsv"
+        rows = [
+            ("Santa Cruz", 36.97, -122.03, 64000),
+            ("Santa Fe", 35.69, -105.94, 88000),
+        ]
+        path.write_text(
+            "".join(
+                f"\t{name}\t{name}\t\t{lat}\t{lon}\tP\tPPL\tUS\t\t\t\t\t\t{pop}\t\t\t\t\n"
+                for name, lat, lon, pop in rows
+            )
+        )
+        geocoder = Geocoder.from_file(str(path))
+        assert geocoder.lookup_loose("Santa") is None
+        assert geocoder.lookup_loose("Santa F")["name"] == "Santa Fe"
+
+    def test_unknown_place(self, geocoder):
+        assert geocoder.lookup("Atlantis") is None
+        assert geocoder.lookup_loose("Atlantis") is None
+        assert geocoder.lookup("") is None
+
+    def test_empty_gazetteer(self, tmp_path):
+        path = tmp_path / "empty.tsv"
+        path.write_text("")
+        assert Geocoder.from_file(str(path)).lookup("London") is None
+
+
+@pytest.mark.asyncio
+async def test_get_lat_lon_falls_back_to_open_meteo():
+    async with respx.mock(base_url="https://geocoding-api.open-meteo.com") as router:
+        router.get("/v1/search").mock(
+            return_value=Response(
+                200,
+                json={
+                    "results": [{"latitude": 1.0, "longitude": 2.0, "name": "Atlantis"}]
+                },
+            )
+        )
+        result = await Tools.get_lat_lon("Atlantis")
+
+    assert result == {"lat": 1.0, "lon": 2.0, "name": "Atlantis"}
+
+
+@pytest.mark.asyncio
+async def test_get_lat_lon_asks_open_meteo_for_near_misses():
+    async with respx.mock(base_url="https://geocoding-api.open-meteo.com") as router:
+        route = router.get("/v1/search").mock(
+            return_value=Response(
+                200,
+                json={
+                    "results": [{"latitude": 45.76, "longitude": 4.84, "name": "Lyon"}]
+                },
+            )
+        )
+        result = await Tools.get_lat_lon("Lyon")
+
+    assert route.called
+    assert result["name"] == "Lyon"
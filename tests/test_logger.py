@@ -0,0 +1,125 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+import pytest
+import structlog
+
+from src import logger as logger_module
+from src.logger import (
+    DroppingQueueHandler,
+    QueueLogSink,
+    configure_logging,
+    get_logger,
+    sample_events,
+    shutdown_logging,
+)
+
+
+def test_sink_writes_on_background_thread():
+    stream = io.StringIO()
+    sink = QueueLogSink(structlog.processors.JSONRenderer(), stream=stream)
+
+    with pytest.raises(structlog.DropEvent):
+        sink(None, "info", {"event": "hello", "session_id": "s1"})
+    sink.close()
+
+    assert json.loads(stream.getvalue()) == {"event": "hello", "session_id": "s1"}
+
+
+def test_sink_truncates_large_values():
+    stream = io.StringIO()
+    sink = QueueLogSink(
+        structlog.processors.JSONRenderer(), stream=stream, max_value_chars=10
+    )
+
+    with pytest.raises(structlog.DropEvent):
+        sink(None, "info", {"event": "big", "text": "x" * 50, "data": {"k": "y" * 50}})
+    sink.close()
+
+    record = json.loads(stream.getvalue())
+    assert record["text"] == "x" * 10 + "...[truncated 40 chars]"
+    assert record["data"].startswith('{"k": "yyy')
+    assert "truncated" in record["data"]
+
+
+def test_sink_counts_dropped_events_when_full():
+    blocked = threading.Event()
+
+    class BlockingStream(io.StringIO):
+        def write(self, s):
+            blocked.wait(timeout=5)
+            return super().write(s)
+
+    stream = BlockingStream()
+    sink = QueueLogSink(structlog.processors.JSONRenderer(), stream=stream, maxsize=1)
+
+    for i in range(5):
+        with pytest.raises(structlog.DropEvent):
+            sink(None, "info", {"event": "spam", "i": i})
+
+    assert sink.dropped >= 3
+    blocked.set()
+    sink.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    reports = [line for line in lines if line["event"] == "log_events_dropped"]
+    assert sum(r["dropped"] for r in reports) == sink.dropped
+
+
+def test_sample_events():
+    processor = sample_events({"noisy": 0.0, "kept": 1.0})
+
+    with pytest.raises(structlog.DropEvent):
+        processor(None, "info", {"event": "noisy"})
+    assert processor(None, "info", {"event": "kept"}) == {"event": "kept"}
+    assert processor(None, "info", {"event": "other"}) == {"event": "other"}
+
+
+def test_stdlib_records_go_through_queue():
+    sink = QueueLogSink(structlog.processors.JSONRenderer(), stream=io.StringIO())
+    log_queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue, sink)
+    logger = logging.getLogger("test.stdlib_queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    logger.warning('%s - "%s"', "127.0.0.1", "GET /health")
+    logger.warning("overflow")
+    sink.close()
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == '127.0.0.1 - "GET /health"'
+    assert sink.dropped == 1
+
+
+def test_sink_writes_synchronously_after_close():
+    stream = io.StringIO()
+    sink = QueueLogSink(structlog.processors.JSONRenderer(), stream=stream)
+    sink.close()
+
+    with pytest.raises(structlog.DropEvent):
+        sink(None, "info", {"event": "late"})
+
+    assert json.loads(stream.getvalue()) == {"event": "late"}
+
+
+def test_reconfigure_keeps_cached_loggers_writing():
+    configure_logging()
+    stream = io.StringIO()
+    logger_module._sink.stream = stream
+    log = get_logger("test.reconfigure")
+
+    log.info("before")  # Caches the processor chain on the logger
+    configure_logging()
+    log.info("after")
+    shutdown_logging()
+    log.info("after_shutdown")
+    configure_logging()
+
+    output = stream.getvalue()
+    for event in ("before", "after", "after_shutdown"):
+        assert event in output
+    assert logger_module.dropped_log_events() == 0
@@ -1,5 +1,5 @@
 import pytest
-from src.models import TripSpec, UserProfile, ConversationState
+from src.models import TripSpec, TripLeg, UserProfile, ConversationState
 
 
 class TestModels:
@@ -24,3 +24,25 @@ class TestModels:
         assert state.user_profile is not None
         assert state.trip_spec is not None
         assert state.history == []
+
+    def test_trip_spec_legs_default_empty(self):
+        spec = TripSpec()
+        assert spec.legs == []
+        assert spec.stops() == []
+
+    def test_trip_spec_single_destination_is_one_stop(self):
+        spec = TripSpec(destination="Paris", start_date="2024-05-01")
+        stops = spec.stops()
+        assert len(stops) == 1
+        assert stops[0].destination == "Paris"
+        assert stops[0].start_date == "2024-05-01"
+
+    def test_trip_spec_legs_from_dicts(self):
+        spec = TripSpec(
+            legs=[
+                {"destination": "Rome", "start_date": "2024-05-01"},
+                {"destination": "Florence"},
+            ]
+        )
+        assert isinstance(spec.legs[0], TripLeg)
+        assert [leg.destination for leg in spec.stops()] == ["Rome", "Florence"]
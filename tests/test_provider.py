@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+import respx
+from httpx import Response
+
+from src.prompts import ROUTER_JSON_INSTRUCTION, ROUTER_SCHEMA, json_instruction
+from src.provider import LLMProvider, PrefixCacheStats, token_usage
+
+
+def test_json_instruction_compiled_once():
+    assert json_instruction(ROUTER_SCHEMA) is ROUTER_JSON_INSTRUCTION
+    assert '"intent"' in ROUTER_JSON_INSTRUCTION
+    # Per-call schemas render the same bytes without being retained
+    assert (
+        json_instruction(json.loads(json.dumps(ROUTER_SCHEMA)))
+        == ROUTER_JSON_INSTRUCTION
+    )
+    assert "Follow this schema" not in json_instruction(None)
+
+
+def test_prefix_cache_stats():
+    stats = PrefixCacheStats()
+    static = {"role": "system", "content": "static prompt"}
+
+    assert not stats.observe([static, {"role": "system", "content": "profile A"}])
+    assert stats.observe([static, {"role": "system", "content": "profile B"}])
+    assert not stats.observe([{"role": "user", "content": "hi"}])
+
+    stats.record_usage(
+        SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=128))
+    )
+    stats.record_usage(SimpleNamespace(prompt_tokens_details=None))
+
+    assert stats.as_dict() == {
+        "requests": 3,
+        "reused": 1,
+        "reuse_rate": 0.333,
+        "cached_tokens": 128,
+    }
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_records_usage():
+    chunks = [
+        {"choices": [{"index": 0, "delta": {"content": "Hel"}}]},
+        {"choices": [{"index": 0, "delta": {"content": "lo"}}]},
+        {
+            "choices": [],
+            "usage": {
+                "prompt_tokens": 900,
+                "completion_tokens": 2,
+                "total_tokens": 902,
+                "prompt_tokens_details": {"cached_tokens": 768},
+            },
+        },
+    ]
+    base = {"id": "c1", "object": "chat.completion.chunk", "created": 0, "model": "m"}
+    body = (
+        "".join(f"data: {json.dumps({**base, **c})}\n\n" for c in chunks)
+        + "data: [DONE]\n\n"
+    )
+
+    provider = LLMProvider()
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    token_usage.set(usage)
+    with respx.mock(base_url=provider.base_url) as router:
+        route = router.post("/chat/completions").mock(
+            return_value=Response(
+                200, text=body, headers={"content-type": "text/event-stream"}
+            )
+        )
+        text = "".join(
+            [c async for c in provider.stream_chat([{"role": "user", "content": "hi"}])]
+        )
+
+    assert text == "Hello"
+    assert json.loads(route.calls[0].request.content)["stream_options"] == {
+        "include_usage": True
+    }
+    assert provider.prefix_stats.cached_tokens == 768
+    assert usage == {"prompt_tokens": 900, "completion_tokens": 2}
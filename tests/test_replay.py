@@ -0,0 +1,116 @@
+import json
+import pytest
+
+from src.replay import StubProvider, load_conversations, run_replay
+
+
+def write_conversations(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            record = {
+                "conversation_id": f"c{i}",
+                "messages": [
+                    {"role": "user", "content": "Hi"},
+                    {"role": "assistant", "content": "Hello!"},
+                    {"role": "user", "content": "Weather in Rome?"},
+                ],
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def read_results(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_replay_writes_turn_results(tmp_path):
+    input_path = tmp_path / "conversations.jsonl"
+    output_path = str(tmp_path / "results.jsonl")
+    write_conversations(input_path, 3)
+
+    stats = await run_replay(
+        load_conversations(str(input_path)), StubProvider(), output_path, concurrency=2
+    )
+
+    assert stats["conversations"] == 3
+    assert stats["turns"] == 6
+    results = read_results(output_path)
+    first = [r for r in results if r["conversation_id"] == "c0"]
+    assert [r["turn"] for r in first] == [0, 1]
+    assert first[0]["reference"] == "Hello!"
+    assert first[0]["intent"] == "chat"
+    assert first[1]["response"] == "Stub reply to: Weather in Rome?"
+    assert first[1]["latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_replay_resumes_from_checkpoint(tmp_path):
+    input_path = tmp_path / "conversations.jsonl"
+    output_path = str(tmp_path / "results.jsonl")
+    write_conversations(input_path, 4)
+
+    # Simulate an interrupted run: c0 finished, c1 partially written
+    with open(output_path, "w") as f:
+        f.write(json.dumps({"conversation_id": "c0", "turn": 0}) + "\n")
+        f.write(json.dumps({"conversation_id": "c1", "turn": 0}) + "\n")
+        f.write('{"conversation_id": "c1", "tu')
+    with open(output_path + ".checkpoint", "w") as f:
+        f.write("c0\n")
+
+    stats = await run_replay(
+        load_conversations(str(input_path)), StubProvider(), output_path
+    )
+
+    assert stats["skipped"] == 1
+    assert stats["conversations"] == 3
+    results = read_results(output_path)
+    assert sum(1 for r in results if r["conversation_id"] == "c0") == 1
+    assert sum(1 for r in results if r["conversation_id"] == "c1") == 2
+
+
+class _FlakyProvider(StubProvider):
+    def __init__(self):
+        self.fail = True
+
+    async def chat(self, messages, temperature=0.7):
+        if self.fail:
+            raise RuntimeError("rate limited")
+        return await super().chat(messages, temperature)
+
+
+@pytest.mark.asyncio
+async def test_replay_retries_failed_conversations(tmp_path):
+    input_path = tmp_path / "conversations.jsonl"
+    output_path = str(tmp_path / "results.jsonl")
+    write_conversations(input_path, 2)
+    provider = _FlakyProvider()
+
+    stats = await run_replay(load_conversations(str(input_path)), provider, output_path)
+    assert stats["failed"] == 2
+    assert all(r["error"] == "rate limited" for r in read_results(output_path))
+
+    provider.fail = False
+    stats = await run_replay(load_conversations(str(input_path)), provider, output_path)
+    assert stats["skipped"] == 0
+    assert stats["failed"] == 0
+    results = read_results(output_path)
+    assert len(results) == 4
+    assert not any(r["error"] for r in results)
+
+
+def test_load_conversations_skips_malformed_records(tmp_path):
+    path = tmp_path / "conversations.jsonl"
+    path.write_text(
+        "not json\n"
+        + json.dumps({"conversation_id": "a", "messages": [{"role": "user"}]})
+        + "\n"
+        + json.dumps({"conversation_id": "b", "messages": "hi"})
+        + "\n"
+        + json.dumps(
+            {"conversation_id": "c", "messages": [{"role": "user", "content": "Hi"}]}
+        )
+        + "\n"
+    )
+
+    assert [c["conversation_id"] for c in load_conversations(str(path))] == ["c"]
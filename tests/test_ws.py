@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from src.agent import TravelAgent
+from src.provider import LLMProvider
+from src.state import SQLiteStateStore
+from src.models import ConversationState
+from src.ws import ChatConnection, ConnectionManager
+
+
+@pytest.fixture
+def agent():
+    store = MagicMock(spec=SQLiteStateStore)
+    store.load = AsyncMock(return_value=ConversationState())
+    store.save = AsyncMock()
+
+    provider = MagicMock(spec=LLMProvider)
+    provider.json_chat = AsyncMock(
+        return_value={"intent": "chat", "tool_call": "none", "reasoning": "test"}
+    )
+
+    async def stream_chat(messages, temperature=0.7):
+        for chunk in ["Hello", " there", "!"]:
+            yield chunk
+
+    provider.stream_chat = stream_chat
+    return TravelAgent(provider, store)
+
+
+@pytest.fixture
+def manager():
+    return ConnectionManager()
+
+
+@pytest.fixture
+def client(agent, manager):
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def chat_socket(websocket: WebSocket, session_id: str = "default_session"):
+        await manager.handle(websocket, agent, session_id)
+
+    @app.post("/push/{session_id}")
+    async def push(session_id: str):
+        return {"accepted": manager.push(session_id, {"event": "weather_ready"})}
+
+    return TestClient(app)
+
+
+def test_ws_streams_turn(client):
+    with client.websocket_connect("/ws?session_id=s1") as ws:
+        ws.send_json({"type": "message", "id": "t1", "message": "Hi"})
+
+        assert ws.receive_json() == {"type": "start", "id": "t1"}
+        deltas = [ws.receive_json() for _ in range(3)]
+        assert "".join(d["text"] for d in deltas) == "Hello there!"
+        assert ws.receive_json() == {
+            "type": "done",
+            "id": "t1",
+            "response": "Hello there!",
+        }
+
+
+def test_ws_multiple_turns_one_connection(client, agent):
+    with client.websocket_connect("/ws?session_id=s1") as ws:
+        for turn_id in ("t1", "t2"):
+            ws.send_json({"type": "message", "id": turn_id, "message": "Hi"})
+            frames = [ws.receive_json() for _ in range(5)]
+            assert frames[-1]["type"] == "done"
+            assert frames[-1]["id"] == turn_id
+
+    assert agent.store.save.call_count == 2
+
+
+def test_ws_ping_and_invalid_frames(client):
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "invalid_json"}
+
+        ws.send_json({"type": "message", "id": "t1", "message": "  "})
+        assert ws.receive_json() == {
+            "type": "error",
+            "id": "t1",
+            "detail": "invalid_message",
+        }
+
+
+def test_ws_server_push(client):
+    with client.websocket_connect("/ws?session_id=s1") as ws:
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+        assert client.post("/push/s1").json() == {"accepted": 1}
+        assert ws.receive_json() == {"type": "push", "event": "weather_ready"}
+
+    assert client.post("/push/s1").json() == {"accepted": 0}
+
+
+def test_push_to_full_outbox_is_not_accepted(agent, manager):
+    connection = ChatConnection(
+        MagicMock(spec=WebSocket), agent, "s1", send_queue_size=1
+    )
+    manager._connections["s1"] = {connection}
+
+    assert manager.push("s1", {"event": "first"}) == 1
+    assert manager.push("s1", {"event": "second"}) == 0
+    assert manager.push("other", {"event": "first"}) == 0